@@ -1,7 +1,34 @@
+import argparse
+import glob
 import os
+import shutil
 import sys
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from wand.image import Image
 
+try:
+    from PIL import Image as PILImage
+except ImportError:
+    PILImage = None
+
+# Optional Pillow plugins for HEIC/AVIF (Pillow 11.2+ also reads and writes AVIF natively)
+try:
+    import pillow_heif
+    pillow_heif.register_heif_opener()
+except ImportError:
+    pass
+try:
+    import pillow_avif  # registers the AVIF plugin on import
+except ImportError:
+    pass
+
+try:
+    import img2pdf
+except ImportError:
+    img2pdf = None
+
 
 # Supported image formats
 SUPPORTED_FORMATS = {
@@ -17,28 +44,71 @@ SUPPORTED_FORMATS = {
     'avif': ['avif'],
 }
 
+# Formats that take a compression quality setting
+LOSSY_FORMATS = frozenset({'jpeg', 'jpg', 'webp'})
+
+# Formats converted with Pillow when it is installed; the rest go through ImageMagick
+PILLOW_FORMATS = frozenset({'jpeg', 'png', 'webp', 'bmp', 'gif', 'tiff'})
+
+# Pillow format names that differ from ours, for formats provided by plugins
+PILLOW_PLUGIN_FORMATS = {'heic': 'HEIF', 'avif': 'AVIF'}
+
+# Use Pillow for HEIC/AVIF as well when a plugin can write them
+if PILImage is not None:
+    PILImage.init()
+    PILLOW_FORMATS |= {fmt for fmt, name in PILLOW_PLUGIN_FORMATS.items() if name in PILImage.SAVE}
+
+# Image modes the Pillow path converts; others (16-bit, 32-bit and float data) are left to
+# ImageMagick, since Pillow's convert('RGB') clips such values instead of scaling them
+PILLOW_MODES = frozenset({'1', 'L', 'LA', 'P', 'RGB', 'RGBA'})
+
+# Formats that can store CMYK as-is; CMYK to anything else needs ImageMagick's color management
+PILLOW_CMYK_FORMATS = frozenset({'jpeg', 'tiff'})
+
+# Formats img2pdf can embed in a PDF without re-encoding
+PDF_PASSTHROUGH_FORMATS = frozenset({'jpeg', 'png'})
+
+# Reverse lookup from file extension to format name, keyed by the common spellings
+# ('jpg', '.jpg', 'JPG', '.JPG') so typical extensions need no normalization
+_EXT_TO_FORMAT = {
+    key: fmt
+    for fmt, exts in SUPPORTED_FORMATS.items()
+    for ext in exts
+    for key in (ext, '.' + ext, ext.upper(), '.' + ext.upper())
+}
+
 
 def get_format_from_extension(extension: str) -> str | None:
     """Get the Wand format name from a file extension."""
-    extension = extension.lower().lstrip('.')
-    for format_name, extensions in SUPPORTED_FORMATS.items():
-        if extension in extensions:
-            return format_name
-    return None
+    format_name = _EXT_TO_FORMAT.get(extension)
+    if format_name is None:
+        # Mixed case or unusual spelling, e.g. '.Jpg'
+        format_name = _EXT_TO_FORMAT.get(extension.lower().lstrip('.'))
+    return format_name
 
 
-def convert_image(input_path: str, output_path: str | None = None, output_format: str | None = None, quality: int = 85) -> str:
-    """Convert an input image to a specified format using Wand.
-    
-    Args:
-        input_path: Path to the input image file
-        output_path: Path for the output file (optional, auto-generated if not provided)
-        output_format: Output format (jpeg, png, gif, webp, pdf, etc.). If None, inferred from output_path extension
-        quality: Compression quality for lossy formats (1-100, default: 85)
-    
-    Returns:
-        The output path on success.
-    """
+def _prefetch(path: str) -> None:
+    """Ask the kernel to start reading a file into the page cache."""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    finally:
+        os.close(fd)
+
+
+def _default_output_path(input_path: str, output_format: str, output_dir: str | None = None) -> str:
+    """Return the input's name with the output format's extension, in output_dir or next to the input."""
+    default_ext = SUPPORTED_FORMATS[output_format][0]
+    stem = os.path.splitext(input_path)[0]
+    if output_dir:
+        stem = os.path.join(output_dir, os.path.basename(stem))
+    return f"{stem}.{default_ext}"
+
+
+def _prepare_output(input_path: str, output_path: str | None, output_format: str | None) -> tuple[str, str]:
+    """Validate a conversion request and return the resolved (output_path, output_format)."""
     if not os.path.isfile(input_path):
         raise FileNotFoundError(f"Input file not found: {input_path}")
     
@@ -58,35 +128,359 @@ def convert_image(input_path: str, output_path: str | None = None, output_format
     
     # Generate output path if not provided
     if output_path is None or output_path.strip() == "":
-        default_ext = SUPPORTED_FORMATS[output_format][0]
-        output_path = os.path.splitext(input_path)[0] + f".{default_ext}"
+        output_path = _default_output_path(input_path, output_format)
     
-    # Ensure parent directory exists
+    # Ensure parent directory exists (makedirs with exist_ok already tolerates an existing one)
     out_dir = os.path.dirname(output_path)
-    if out_dir and not os.path.isdir(out_dir):
+    if out_dir:
         os.makedirs(out_dir, exist_ok=True)
     
+    return output_path, output_format
+
+
+def _check_not_input(input_path: str, output_path: str, output_format: str, quality: int | None,
+                     max_size: tuple[int, int] | None) -> None:
+    """Raise ValueError if a conversion would re-encode an image over its own input file."""
+    input_format = get_format_from_extension(os.path.splitext(input_path)[1])
+    if quality is None and max_size is None and input_format == output_format:
+        return  # copied as-is, so writing onto the input leaves it unchanged
+    if os.path.exists(output_path) and os.path.samefile(input_path, output_path):
+        raise ValueError(f"Output would overwrite the input file: {input_path}. "
+                         f"Choose a different output path or directory.")
+
+
+def _pillow_convert(input_path: str, output_path: str, output_format: str, quality: int | None,
+                    max_size: tuple[int, int] | None = None) -> bool:
+    """Convert a single-frame image with Pillow. Returns False if Wand should handle it instead."""
+    try:
+        # Pillow refuses images past its decompression-bomb limit; ImageMagick handles them
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', PILImage.DecompressionBombWarning)
+            with PILImage.open(input_path) as im:
+                # Animations and multi-page files keep ImageMagick's frame handling
+                if getattr(im, 'n_frames', 1) > 1:
+                    return False
+                if im.mode not in PILLOW_MODES and not (im.mode == 'CMYK' and output_format in PILLOW_CMYK_FORMATS):
+                    return False
+                
+                if max_size is not None:
+                    # thumbnail() calls draft() first, so JPEGs are decoded at a reduced DCT scale
+                    im.thumbnail(max_size, PILImage.Resampling.LANCZOS)
+                
+                # Carry color profile and EXIF over, as ImageMagick does
+                save_kwargs = {key: im.info[key] for key in ('icc_profile', 'exif') if key in im.info}
+                if output_format in LOSSY_FORMATS:
+                    save_kwargs['quality'] = quality if quality is not None else 85
+                source_mode = im.mode
+                if output_format == 'jpeg' and im.mode not in ('RGB', 'L', 'CMYK'):
+                    im = im.convert('RGB')
+                elif (output_format == 'webp' or output_format in PILLOW_PLUGIN_FORMATS) and im.mode not in ('RGB', 'RGBA'):
+                    has_alpha = 'A' in im.getbands() or 'transparency' in im.info
+                    im = im.convert('RGBA' if has_alpha else 'RGB')
+                # The source profile describes the old color space, so it no longer applies
+                # (some encoders read it from im.info, which convert() copies)
+                if im.mode != source_mode:
+                    save_kwargs.pop('icc_profile', None)
+                    im.info.pop('icc_profile', None)
+                
+                pillow_format = PILLOW_PLUGIN_FORMATS.get(output_format, output_format.upper())
+                im.save(output_path, pillow_format, optimize=False, **save_kwargs)
+    except (OSError, ValueError, PILImage.DecompressionBombError):
+        return False
+    return True
+
+
+def _pillow_to_pdf(input_path: str, output_path: str, quality: int | None) -> bool:
+    """Write a multi-frame image as a PDF with one page per frame, using Pillow.
+    
+    Pages are decoded and written one frame at a time, so memory use does not grow with the
+    page count. Returns False for single-frame images, or if Wand should handle the file instead.
+    """
+    try:
+        # Pillow refuses images past its decompression-bomb limit; ImageMagick handles them
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', PILImage.DecompressionBombWarning)
+            with PILImage.open(input_path) as im:
+                if getattr(im, 'n_frames', 1) <= 1:
+                    return False
+                resolution = float(im.info.get('dpi', (72.0, 72.0))[0]) or 72.0
+                # RGB pages are stored as JPEG, so quality applies to them
+                im.save(output_path, 'PDF', save_all=True, resolution=resolution,
+                        quality=quality if quality is not None else 85)
+    except (OSError, ValueError, PILImage.DecompressionBombError):
+        return False
+    return True
+
+
+def _convert_with(img: Image, input_path: str, output_path: str, output_format: str, quality: int | None,
+                  max_size: tuple[int, int] | None = None) -> None:
+    """Convert one image using an existing wand, which is cleared first so it can be reused."""
+    input_format = get_format_from_extension(os.path.splitext(input_path)[1])
+    
+    # Same format and no quality or size requested: copy the bytes instead of re-encoding
+    if quality is None and max_size is None and input_format == output_format:
+        try:
+            shutil.copyfile(input_path, output_path)
+        except shutil.SameFileError:
+            pass
+        return
+    
+    # JPEG/PNG data can be wrapped in a PDF as-is, skipping ImageMagick's PDF coder
+    if (output_format == 'pdf' and max_size is None and img2pdf is not None
+            and input_format in PDF_PASSTHROUGH_FORMATS):
+        try:
+            # img2pdf opens the file with Pillow; very large images are left to ImageMagick
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', PILImage.DecompressionBombWarning)
+                pdf_bytes = img2pdf.convert(input_path)
+        except (img2pdf.AlphaChannelError, img2pdf.ImageOpenError,
+                img2pdf.UnsupportedColorspaceError, img2pdf.JpegColorspaceError,
+                img2pdf.ExifOrientationError, PILImage.DecompressionBombError):
+            pass  # e.g. PNG with transparency or an oversized image; let ImageMagick handle it
+        else:
+            with open(output_path, 'wb') as f:
+                f.write(pdf_bytes)
+            return
+    
+    # Multi-frame images (animated GIF, multi-page TIFF) are streamed into the PDF
+    # page by page instead of ImageMagick holding every frame in memory
+    if output_format == 'pdf' and max_size is None and PILImage is not None and input_format in PILLOW_FORMATS:
+        if _pillow_to_pdf(input_path, output_path, quality):
+            return
+    
+    # Common raster formats skip ImageMagick's coder modules and per-call ctypes overhead
+    if PILImage is not None and input_format in PILLOW_FORMATS and output_format in PILLOW_FORMATS:
+        if _pillow_convert(input_path, output_path, output_format, quality, max_size):
+            return
+    
+    img.clear()
+    
+    # Let libjpeg decode at a reduced scale (1/2, 1/4 or 1/8) that still covers
+    # max_size, so the IDCT skips detail the resize would throw away
+    if max_size is not None and input_format == 'jpeg':
+        img.options['jpeg:size'] = f"{max_size[0]}x{max_size[1]}"
+    
+    # Readahead overlaps disk I/O with ImageMagick's coder setup
+    _prefetch(input_path)
+    img.read(filename=input_path)
+    img.format = output_format
+    
+    # Shrink to fit within max_size, preserving aspect ratio; never enlarge
+    if max_size is not None:
+        max_width, max_height = max_size
+        if img.width > max_width or img.height > max_height:
+            scale = min(max_width / img.width, max_height / img.height)
+            img.resize(max(1, round(img.width * scale)), max(1, round(img.height * scale)), filter='lanczos')
+    
+    # Set quality for lossy formats
+    if output_format in LOSSY_FORMATS:
+        img.compression_quality = quality if quality is not None else 85
+
+    # Skip the extra Huffman-table optimization pass; libjpeg(-turbo)
+    # then encodes in a single pass over the DCT coefficients
+    if output_format == 'jpeg':
+        img.options['jpeg:optimize-coding'] = 'false'
+
+    img.save(filename=output_path)
+
+
+def convert_image(input_path: str, output_path: str | None = None, output_format: str | None = None, quality: int | None = None,
+                  max_size: tuple[int, int] | None = None) -> str:
+    """Convert an input image to a specified format using Pillow or Wand.
+    
+    Args:
+        input_path: Path to the input image file
+        output_path: Path for the output file (optional, auto-generated if not provided)
+        output_format: Output format (jpeg, png, gif, webp, pdf, etc.). If None, inferred from output_path extension
+        quality: Compression quality for lossy formats (1-100, default: 85). If omitted and the
+            input is already in output_format, the file is copied without re-encoding
+        max_size: Optional (width, height) bounding box; larger images are scaled down to fit
+    
+    Returns:
+        The output path on success.
+    
+    Raises:
+        ValueError: If the image would be re-encoded over its own input file, e.g. a JPEG
+            resized to JPEG without an output_path.
+    """
+    output_path, output_format = _prepare_output(input_path, output_path, output_format)
+    _check_not_input(input_path, output_path, output_format, quality, max_size)
+    
     # Perform conversion
-    with Image(filename=input_path) as img:
-        img.format = output_format
-        
-        # Set quality for lossy formats
-        if output_format in ['jpeg', 'jpg', 'webp']:
-            img.compression_quality = quality
-        
-        img.save(filename=output_path)
+    with Image() as img:
+        _convert_with(img, input_path, output_path, output_format, quality, max_size)
     
     return output_path
 
 
+def _convert_chunk(jobs: list[tuple[str, str]], output_format: str, quality: int | None,
+                   max_size: tuple[int, int] | None = None) -> list[str]:
+    """Convert a run of (input, output) path pairs in one worker, reusing a single wand for all of them."""
+    outputs = []
+    with Image() as img:
+        for input_path, output_path in jobs:
+            output_path, fmt = _prepare_output(input_path, output_path, output_format)
+            _convert_with(img, input_path, output_path, fmt, quality, max_size)
+            outputs.append(output_path)
+    return outputs
+
+
+def _check_batch_outputs(inputs: list[str], outputs: list[str]) -> None:
+    """Raise ValueError if two inputs map to one output, or an output would overwrite another input."""
+    def key(path: str) -> str:
+        return os.path.normcase(os.path.abspath(path))
+    
+    input_keys = {key(path): path for path in inputs}
+    seen: dict[str, str] = {}
+    for input_path, output_path in zip(inputs, outputs):
+        out_key = key(output_path)
+        if out_key in seen:
+            raise ValueError(f"{seen[out_key]} and {input_path} would both be written to {output_path}")
+        if out_key in input_keys and out_key != key(input_path):
+            raise ValueError(f"Converting {input_path} would overwrite input file {input_keys[out_key]}")
+        seen[out_key] = input_path
+
+
+def convert_batch(inputs: list[str], output_format: str, quality: int | None = None, workers: int | None = None,
+                  max_size: tuple[int, int] | None = None, output_dir: str | None = None) -> list[str]:
+    """Convert many images in parallel.
+    
+    Args:
+        inputs: Paths to the input image files
+        output_format: Output format (jpeg, png, gif, webp, pdf, etc.)
+        quality: Compression quality for lossy formats (1-100, default: 85). If omitted, inputs
+            already in output_format are copied without re-encoding
+        workers: Number of worker processes (default: number of CPUs)
+        max_size: Optional (width, height) bounding box; larger images are scaled down to fit
+        output_dir: Directory for the outputs (default: next to each input)
+    
+    Returns:
+        The output paths, in the same order as inputs.
+    
+    Raises:
+        ValueError: If two inputs would be written to the same output path (e.g. a.png and
+            a.gif to a.webp), an output would overwrite another input, or an input would be
+            re-encoded in place (same format with quality or max_size). Nothing is converted.
+    """
+    output_format = output_format.lower()
+    if output_format not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported output format: {output_format}. Supported formats: {', '.join(SUPPORTED_FORMATS.keys())}")
+    
+    # Resolve every output path up front so clashes are caught before any worker writes
+    outputs = [_default_output_path(path, output_format, output_dir) for path in inputs]
+    _check_batch_outputs(inputs, outputs)
+    for input_path, output_path in zip(inputs, outputs):
+        _check_not_input(input_path, output_path, output_format, quality, max_size)
+    jobs = list(zip(inputs, outputs))
+    
+    workers = workers or os.cpu_count() or 1
+    
+    # Split into a few chunks per worker: enough to balance load, while each
+    # chunk still reuses one wand across all of its files
+    chunk_size = max(1, -(-len(jobs) // (workers * 4)))
+    chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+    
+    convert = partial(_convert_chunk, output_format=output_format, quality=quality, max_size=max_size)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return [out for outputs in executor.map(convert, chunks) for out in outputs]
+
+
 def list_supported_formats() -> list[str]:
     """Return a list of supported output formats."""
     return list(SUPPORTED_FORMATS.keys())
 
 
-def main() -> None:
-    """Interactive CLI for image conversion."""
+def _expand_inputs(patterns: list[str]) -> list[str]:
+    """Expand glob patterns into file paths; plain paths are passed through unchanged.
+    
+    Existing files are taken literally even when their names contain glob characters,
+    e.g. 'photo [1].png'.
+    """
+    inputs = []
+    for pattern in patterns:
+        if not os.path.exists(pattern) and any(ch in pattern for ch in '*?['):
+            inputs.extend(sorted(glob.glob(pattern)))
+        else:
+            inputs.append(pattern)
+    return inputs
+
+
+def _parse_size(value: str) -> tuple[int, int]:
+    """Parse a WIDTHxHEIGHT size argument."""
     try:
+        width, height = (int(part) for part in value.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {value} (expected WIDTHxHEIGHT)")
+    if width < 1 or height < 1:
+        raise argparse.ArgumentTypeError(f"invalid size: {value} (dimensions must be positive)")
+    return width, height
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    """Parse command-line arguments for one-shot (non-interactive) conversion."""
+    parser = argparse.ArgumentParser(prog='image_converter.py', description="Convert images between formats.")
+    parser.add_argument('inputs', nargs='+', help="input image files or glob patterns (e.g. 'photos/*.png')")
+    parser.add_argument('-f', '--format', type=str.lower, choices=list_supported_formats(),
+                        help="output format (inferred from --output if omitted)")
+    destination = parser.add_mutually_exclusive_group()
+    destination.add_argument('-o', '--output', help="output path (single input only)")
+    destination.add_argument('-d', '--output-dir', help="directory for the outputs (default: next to each input)")
+    parser.add_argument('-q', '--quality', type=int, help="quality for lossy formats, 1-100 (default: 85)")
+    parser.add_argument('-s', '--max-size', type=_parse_size, metavar='WxH',
+                        help="scale images down to fit within WIDTHxHEIGHT (e.g. 1920x1080)")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        help="worker processes for multiple inputs (default: number of CPUs)")
+    args = parser.parse_args(argv)
+    if args.quality is not None and not (1 <= args.quality <= 100):
+        parser.error("quality must be between 1 and 100")
+    args.inputs = _expand_inputs(args.inputs)
+    if not args.inputs:
+        parser.error("no input files match")
+    if len(args.inputs) > 1 and args.output:
+        parser.error("--output can only be used with a single input")
+    if not args.format and not args.output:
+        parser.error("--format is required unless --output is given")
+    return args
+
+
+def _run(args: argparse.Namespace) -> None:
+    """Perform the conversion described by parsed command-line arguments."""
+    if len(args.inputs) == 1:
+        output_path = args.output
+        if args.output_dir:
+            output_path = _default_output_path(args.inputs[0], args.format, args.output_dir)
+        out = convert_image(args.inputs[0], output_path, args.format, args.quality, args.max_size)
+        print(f"✓ Successfully converted to: {out}")
+    else:
+        outputs = convert_batch(args.inputs, args.format, args.quality, args.jobs, args.max_size, args.output_dir)
+        print(f"✓ Successfully converted {len(outputs)} files")
+
+
+def _prompt_quality(output_format: str) -> int | None:
+    """Ask for a compression quality when the output format is lossy (None keeps the default)."""
+    quality = None
+    if output_format in LOSSY_FORMATS:
+        quality_input = input("Enter quality (1-100) [default: 85]: ").strip()
+        if quality_input:
+            try:
+                quality = int(quality_input)
+                if not (1 <= quality <= 100):
+                    print("Quality must be between 1 and 100. Using default: 85")
+                    quality = None
+            except ValueError:
+                print("Invalid quality value. Using default: 85")
+                quality = None
+    return quality
+
+
+def main(argv: list[str] | None = None) -> None:
+    """CLI for image conversion: one-shot when arguments are given, interactive otherwise."""
+    argv = sys.argv[1:] if argv is None else argv
+    try:
+        if argv:
+            _run(_parse_args(argv))
+            return
+        
         print("=== Image Converter ===\n")
         print("Supported output formats:")
         for i, fmt in enumerate(list_supported_formats(), 1):
@@ -112,14 +506,27 @@ def main() -> None:
             output_format = format_choice
         
         # Get input file path
-        input_path = input("\nEnter path to input image file: ").strip().strip('"')
+        input_path = input("\nEnter path to input image file (or a pattern like *.png): ").strip().strip('"')
         if not input_path:
             print("No input provided — exiting.")
             return
         
+        # Batch mode: convert every file matching the pattern
+        # (an existing file whose name merely contains glob characters is converted as-is)
+        if not os.path.exists(input_path) and any(ch in input_path for ch in '*?['):
+            inputs = _expand_inputs([input_path])
+            if not inputs:
+                print(f"No files match: {input_path}")
+                return
+            output_dir = input("Enter output directory [default: next to each input]: ").strip().strip('"')
+            quality = _prompt_quality(output_format)
+            print(f"\nConverting {len(inputs)} files to {output_format.upper()}...")
+            outputs = convert_batch(inputs, output_format, quality, output_dir=output_dir or None)
+            print(f"✓ Successfully converted {len(outputs)} files")
+            return
+        
         # Generate default output path
-        default_ext = SUPPORTED_FORMATS[output_format][0]
-        default_output = os.path.splitext(input_path)[0] + f".{default_ext}"
+        default_output = _default_output_path(input_path, output_format)
         
         # Get output path
         output_path = input(f"Enter output path [default: {default_output}]: ").strip().strip('"')
@@ -127,18 +534,7 @@ def main() -> None:
             output_path = default_output
         
         # Get quality for lossy formats
-        quality = 85
-        if output_format in ['jpeg', 'jpg', 'webp']:
-            quality_input = input(f"Enter quality (1-100) [default: {quality}]: ").strip()
-            if quality_input:
-                try:
-                    quality = int(quality_input)
-                    if not (1 <= quality <= 100):
-                        print("Quality must be between 1 and 100. Using default: 85")
-                        quality = 85
-                except ValueError:
-                    print("Invalid quality value. Using default: 85")
-                    quality = 85
+        quality = _prompt_quality(output_format)
         
         print(f"\nConverting:\n  Input: {input_path}\n  Output: {output_path}\n  Format: {output_format.upper()}")
         
@@ -10,6 +10,18 @@ from video_converter import main as video_main
 
 def main() -> None:
     """Main entry point for the file converter application."""
+    # One-shot mode: python main.py image|video <converter arguments>
+    if len(sys.argv) > 1:
+        kind, argv = sys.argv[1], sys.argv[2:]
+        if kind == 'image':
+            image_main(argv or ['--help'])
+        elif kind == 'video':
+            video_main(argv or ['--help'])
+        else:
+            print(f"Unknown converter: {kind}. Use 'image' or 'video'.")
+            sys.exit(2)
+        return
+    
     print("=" * 50)
     print("       FILE CONVERTER")
     print("=" * 50)
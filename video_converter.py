@@ -1,6 +1,13 @@
+import argparse
+import functools
+import glob
 import os
+import re
+import shutil
 import sys
 import subprocess
+import threading
+from collections import deque
 
 try:
     import imageio_ffmpeg
@@ -22,7 +29,80 @@ SUPPORTED_FORMATS = {
     'ogv': ['ogv'],
 }
 
+# Reverse lookup from file extension to format name, keyed by the common spellings
+# ('mp4', '.mp4', 'MP4', '.MP4') so typical extensions need no normalization
+_EXT_TO_FORMAT = {
+    key: fmt
+    for fmt, exts in SUPPORTED_FORMATS.items()
+    for ext in exts
+    for key in (ext, '.' + ext, ext.upper(), '.' + ext.upper())
+}
+
+# Software encoder rate control for each quality setting ('copy' skips encoding)
+QUALITY_PRESETS = {
+    'low': ('-crf', '28', '-preset', 'fast'),
+    'medium': ('-crf', '23', '-preset', 'medium'),
+    'high': ('-crf', '18', '-preset', 'medium'),
+    'archive': ('-crf', '18', '-preset', 'veryslow'),
+}
+
+_CPU_COUNT = str(os.cpu_count() or 1)
+
+# Encoder names for codec aliases; anything else is passed to ffmpeg unchanged
+CODEC_ALIASES = {
+    'h264': 'libx264',
+    'libx264': 'libx264',
+    'h265': 'libx265',
+    'hevc': 'libx265',
+    'libx265': 'libx265',
+    'vp9': 'libvpx-vp9',
+    'vp8': 'libvpx',
+}
+
+# Hardware encoders that can replace each software encoder, in order of preference
+HW_ENCODERS = {
+    'libx264': ['h264_nvenc', 'h264_qsv', 'h264_videotoolbox'],
+    'libx265': ['hevc_nvenc', 'hevc_qsv', 'hevc_videotoolbox'],
+}
+
+# Decoder arguments matching each hardware encoder family
+HW_DECODE_ARGS = {
+    'nvenc': ['-hwaccel', 'cuda', '-hwaccel_output_format', 'cuda'],
+    'qsv': ['-hwaccel', 'qsv'],
+    'videotoolbox': ['-hwaccel', 'videotoolbox'],
+}
+
+# NVENC presets (p1 fastest .. p7 best quality) for each quality setting
+NVENC_PRESETS = {'low': 'p2', 'medium': 'p4', 'high': 'p6', 'archive': 'p7'}
+
+# Codecs each container can take as-is, so a conversion only needs a remux
+REMUX_VIDEO_CODECS = {
+    'mp4': {'h264', 'hevc', 'av1', 'mpeg4'},
+    'm4v': {'h264', 'hevc', 'mpeg4'},
+    'mov': {'h264', 'hevc', 'mpeg4', 'prores'},
+    'mkv': {'h264', 'hevc', 'av1', 'vp8', 'vp9', 'mpeg4'},
+    'webm': {'vp8', 'vp9', 'av1'},
+}
+REMUX_AUDIO_CODECS = {
+    'mp4': {'aac', 'mp3', 'ac3', 'eac3'},
+    'm4v': {'aac', 'mp3', 'ac3', 'eac3'},
+    'mov': {'aac', 'mp3', 'ac3', 'eac3', 'alac'},
+    'mkv': {'aac', 'mp3', 'ac3', 'eac3', 'opus', 'vorbis', 'flac'},
+    'webm': {'opus', 'vorbis'},
+}
+
+# MP4-family containers, which can carry their index at the front of the file
+FASTSTART_FORMATS = frozenset({'mp4', 'mov', 'm4v', '3gp'})
+
+# Placeholders for the input and output paths in cached command templates
+_INPUT = object()
+_OUTPUT = object()
+
+# Matches stream lines in ffmpeg's input summary, e.g. "Stream #0:0(und): Video: h264 (High) ..."
+_STREAM_RE = re.compile(r'Stream #\d+:\d+.*?: (Video|Audio|Subtitle): (\w+)')
+
 
+@functools.lru_cache(maxsize=1)
 def get_ffmpeg_path() -> str:
     """Get the path to ffmpeg executable (bundled or system)."""
     if imageio_ffmpeg is None:
@@ -33,25 +113,195 @@ def get_ffmpeg_path() -> str:
     return imageio_ffmpeg.get_ffmpeg_exe()
 
 
+def _run_ffmpeg(cmd: list[str], tail_lines: int = 200) -> None:
+    """Run an ffmpeg command, draining stderr so the encoder never blocks on a full pipe.
+
+    Only the last ``tail_lines`` lines of output are kept for error reporting.
+    """
+    process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.PIPE, text=True, errors='replace')
+    tail: deque[str] = deque(maxlen=tail_lines)
+    drain = threading.Thread(target=tail.extend, args=(process.stderr,), daemon=True)
+    drain.start()
+    returncode = process.wait()
+    drain.join()
+    process.stderr.close()
+    if returncode != 0:
+        error_msg = ''.join(tail).strip() or f"ffmpeg exited with status {returncode}"
+        raise RuntimeError(f"ffmpeg conversion failed: {error_msg}")
+
+
 def get_format_from_extension(extension: str) -> str | None:
     """Get the format name from a file extension."""
-    extension = extension.lower().lstrip('.')
-    for format_name, extensions in SUPPORTED_FORMATS.items():
-        if extension in extensions:
-            return format_name
+    format_name = _EXT_TO_FORMAT.get(extension)
+    if format_name is None:
+        # Mixed case or unusual spelling, e.g. '.Mp4'
+        format_name = _EXT_TO_FORMAT.get(extension.lower().lstrip('.'))
+    return format_name
+
+
+def _probe_codecs(ffmpeg_exe: str, path: str) -> dict[str, list[str]]:
+    """Return the codec names of a media file's streams, keyed by stream type.
+
+    The bundled ffmpeg comes without ffprobe, so this parses the input summary
+    ffmpeg prints when run without an output file.
+    """
+    result = subprocess.run([ffmpeg_exe, '-hide_banner', '-i', path], stdin=subprocess.DEVNULL,
+                            capture_output=True, text=True, errors='replace')
+    streams: dict[str, list[str]] = {}
+    for line in result.stderr.splitlines():
+        match = _STREAM_RE.search(line)
+        # Cover art is stored as a video stream but is not mapped by default
+        if match and 'attached pic' not in line:
+            streams.setdefault(match.group(1).lower(), []).append(match.group(2))
+    return streams
+
+
+def _can_remux(streams: dict[str, list[str]], output_format: str) -> bool:
+    """Check whether every stream can be copied into the output container unchanged."""
+    video_codecs = REMUX_VIDEO_CODECS.get(output_format)
+    audio_codecs = REMUX_AUDIO_CODECS.get(output_format)
+    if not video_codecs or not streams.get('video') or streams.get('subtitle'):
+        return False
+    return (all(c in video_codecs for c in streams['video'])
+            and all(c in audio_codecs for c in streams.get('audio', [])))
+
+
+def _resolve_video_codec(output_format: str, codec: str | None) -> str | None:
+    """Map a codec alias (or the format's default) to an ffmpeg encoder name."""
+    if codec:
+        return CODEC_ALIASES.get(codec.lower(), codec)
+    
+    # Default codecs for common formats
+    if output_format == 'mp4':
+        return 'libx264'
+    elif output_format == 'webm':
+        return 'libvpx-vp9'
+    elif output_format == 'mkv':
+        return 'libx264'
+    return None
+
+
+@functools.lru_cache(maxsize=1)
+def get_available_encoders() -> frozenset[str]:
+    """Return the names of the encoders compiled into the ffmpeg executable."""
+    result = subprocess.run([get_ffmpeg_path(), '-hide_banner', '-encoders'],
+                            stdin=subprocess.DEVNULL, capture_output=True, text=True)
+    encoders = set()
+    for line in result.stdout.splitlines():
+        # Encoder lines look like: " V....D h264_nvenc   NVIDIA NVENC H.264 encoder"
+        parts = line.split()
+        if len(parts) >= 2 and len(parts[0]) == 6:
+            encoders.add(parts[1])
+    return frozenset(encoders)
+
+
+def _select_hw_encoder(video_codec: str | None) -> str | None:
+    """Return the first available hardware encoder that can replace a software encoder."""
+    candidates = HW_ENCODERS.get(video_codec, [])
+    if not candidates:
+        return None
+    available = get_available_encoders()
+    for encoder in candidates:
+        if encoder in available:
+            return encoder
     return None
 
 
+def _hw_encoder_args(hw_encoder: str, quality: str) -> list[str]:
+    """Return preset and rate-control arguments for a hardware encoder at a quality preset."""
+    crf = int(QUALITY_PRESETS.get(quality, QUALITY_PRESETS['medium'])[1])
+    if hw_encoder.endswith('_nvenc'):
+        preset = NVENC_PRESETS.get(quality, 'p4')
+        return ['-preset', preset, '-tune', 'hq', '-rc', 'vbr', '-cq', str(crf)]
+    elif hw_encoder.endswith('_qsv'):
+        preset = {'low': 'veryfast', 'high': 'slow', 'archive': 'veryslow'}.get(quality, 'medium')
+        return ['-preset', preset, '-global_quality', str(crf)]
+    # VideoToolbox uses a 1-100 constant-quality scale where higher is better
+    return ['-q:v', str(100 - 2 * crf)]
+
+
+def _software_encoder_args(quality: str, video_codec: str | None) -> list[str]:
+    """Return codec, quality and threading arguments for a software (CPU) encode."""
+    # Stream copy: no encoder is involved, so no codec or rate-control options apply
+    if quality == 'copy':
+        return ['-c:v', 'copy', '-c:a', 'copy']
+    
+    args = []
+    if video_codec:
+        args.extend(['-c:v', video_codec])
+    
+    # Set quality preset
+    args.extend(QUALITY_PRESETS.get(quality, QUALITY_PRESETS['medium']))
+    if quality == 'high' and video_codec == 'libx264':
+        args.extend(['-tune', 'film'])
+    
+    # Use every core for encoding and filtering
+    args.extend(['-threads', '0', '-filter_threads', _CPU_COUNT, '-filter_complex_threads', _CPU_COUNT])
+    if video_codec == 'libx265':
+        args.extend(['-x265-params', 'pools=*'])
+    elif video_codec == 'libvpx-vp9':
+        # libvpx-vp9 is single-threaded per frame unless row/tile parallelism is enabled
+        args.extend(['-row-mt', '1', '-tile-columns', '2', '-cpu-used', '2'])
+    
+    # Set audio codec
+    args.extend(['-c:a', 'aac'])
+    return args
+
+
+@functools.lru_cache(maxsize=64)
+def _build_command_template(output_format: str, quality: str, video_codec: str | None,
+                            hw_encoder: str | None = None) -> tuple:
+    """Build the ffmpeg arguments for a conversion, with placeholders for the input and output paths.
+    
+    Batch conversions repeat the same settings for every file, so the result is cached.
+    """
+    cmd = []
+    
+    # Hardware decode keeps frames on the device when the encoder can consume them
+    if hw_encoder:
+        cmd.extend(HW_DECODE_ARGS[hw_encoder.rsplit('_', 1)[1]])
+    
+    cmd.extend(['-i', _INPUT, '-y'])  # -y to overwrite output file
+    
+    if hw_encoder:
+        cmd.extend(['-c:v', hw_encoder])
+        cmd.extend(_hw_encoder_args(hw_encoder, quality))
+        cmd.extend(['-c:a', 'aac'])
+    else:
+        cmd.extend(_software_encoder_args(quality, video_codec))
+    
+    # Write the index (moov atom) at the start so playback can begin before the whole file arrives
+    if output_format in FASTSTART_FORMATS:
+        cmd.extend(['-movflags', '+faststart'])
+    
+    cmd.append(_OUTPUT)
+    return tuple(cmd)
+
+
+def _build_command(ffmpeg_exe: str, input_path: str, output_path: str, output_format: str, quality: str,
+                   video_codec: str | None, hw_encoder: str | None = None) -> list[str]:
+    """Build the ffmpeg argument list for a conversion."""
+    template = _build_command_template(output_format, quality, video_codec, hw_encoder)
+    return [ffmpeg_exe] + [input_path if arg is _INPUT else output_path if arg is _OUTPUT else arg
+                           for arg in template]
+
+
 def convert_video(input_path: str, output_path: str | None = None, output_format: str | None = None, 
-                  quality: str = 'medium', codec: str | None = None) -> str:
+                  quality: str = 'medium', codec: str | None = None, hwaccel: bool = False,
+                  remux: bool = True) -> str:
     """Convert an input video to a specified format using ffmpeg.
     
     Args:
         input_path: Path to the input video file
         output_path: Path for the output file (optional, auto-generated if not provided)
         output_format: Output format (mp4, avi, mov, mkv, webm, etc.). If None, inferred from output_path extension
-        quality: Video quality preset ('low', 'medium', 'high', 'copy'). Default: 'medium'
+        quality: Video quality preset ('low', 'medium', 'high', 'archive', 'copy'). Default: 'medium'
         codec: Video codec (h264, h265, vp9, etc.). If None, uses default for format
+        hwaccel: Use a GPU encoder (NVENC, QSV, VideoToolbox) for H.264/H.265 when available,
+            falling back to the software encoder otherwise. Default: False
+        remux: When the container changes, no codec is given and the input's streams fit the
+            output container, copy them without re-encoding regardless of quality. Default: True
     
     Returns:
         The output path on success.
@@ -78,63 +328,43 @@ def convert_video(input_path: str, output_path: str | None = None, output_format
         default_ext = SUPPORTED_FORMATS[output_format][0]
         output_path = os.path.splitext(input_path)[0] + f".{default_ext}"
     
-    # Ensure parent directory exists
+    # Ensure parent directory exists (makedirs with exist_ok already tolerates an existing one)
     out_dir = os.path.dirname(output_path)
-    if out_dir and not os.path.isdir(out_dir):
+    if out_dir:
         os.makedirs(out_dir, exist_ok=True)
     
-    # Get bundled ffmpeg executable path
-    ffmpeg_exe = get_ffmpeg_path()
+    input_format = get_format_from_extension(os.path.splitext(input_path)[1])
     
-    # Build ffmpeg command
-    cmd = [ffmpeg_exe, '-i', input_path, '-y']  # -y to overwrite output file
+    # Copying into the same container is a plain file copy; no need to run ffmpeg
+    if quality == 'copy' and codec is None and input_format == output_format:
+        try:
+            shutil.copyfile(input_path, output_path)
+        except shutil.SameFileError:
+            pass
+        return output_path
     
-    # Set codec if specified, otherwise use defaults
-    if codec:
-        if codec.lower() in ['h264', 'libx264']:
-            cmd.extend(['-c:v', 'libx264'])
-        elif codec.lower() in ['h265', 'hevc', 'libx265']:
-            cmd.extend(['-c:v', 'libx265'])
-        elif codec.lower() == 'vp9':
-            cmd.extend(['-c:v', 'libvpx-vp9'])
-        elif codec.lower() == 'vp8':
-            cmd.extend(['-c:v', 'libvpx'])
-        else:
-            cmd.extend(['-c:v', codec])
-    else:
-        # Default codecs for common formats
-        if output_format == 'mp4':
-            cmd.extend(['-c:v', 'libx264'])
-        elif output_format == 'webm':
-            cmd.extend(['-c:v', 'libvpx-vp9'])
-        elif output_format == 'mkv':
-            cmd.extend(['-c:v', 'libx264'])
+    # Get bundled ffmpeg executable path
+    ffmpeg_exe = get_ffmpeg_path()
     
-    # Set quality preset
-    if quality == 'copy':
-        cmd.extend(['-c:v', 'copy', '-c:a', 'copy'])
-    elif quality == 'low':
-        cmd.extend(['-crf', '28', '-preset', 'fast'])
-    elif quality == 'medium':
-        cmd.extend(['-crf', '23', '-preset', 'medium'])
-    elif quality == 'high':
-        cmd.extend(['-crf', '18', '-preset', 'slow'])
-    else:
-        cmd.extend(['-crf', '23', '-preset', 'medium'])
+    # A container change with compatible streams only needs the muxer
+    if remux and codec is None and quality != 'copy' and input_format != output_format:
+        if _can_remux(_probe_codecs(ffmpeg_exe, input_path), output_format):
+            quality = 'copy'
     
-    # Set audio codec
-    if quality != 'copy':
-        cmd.extend(['-c:a', 'aac'])
+    video_codec = _resolve_video_codec(output_format, codec)
     
-    cmd.append(output_path)
+    # Try a hardware encoder first; the encoder list only reflects how ffmpeg was
+    # built, so fall back to the software encoder if no usable device is present
+    hw_encoder = _select_hw_encoder(video_codec) if hwaccel and quality != 'copy' else None
+    if hw_encoder:
+        try:
+            _run_ffmpeg(_build_command(ffmpeg_exe, input_path, output_path, output_format, quality, video_codec, hw_encoder))
+            return output_path
+        except RuntimeError:
+            pass
     
-    # Run ffmpeg
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        return output_path
-    except subprocess.CalledProcessError as e:
-        error_msg = e.stderr if e.stderr else str(e)
-        raise RuntimeError(f"ffmpeg conversion failed: {error_msg}")
+    _run_ffmpeg(_build_command(ffmpeg_exe, input_path, output_path, output_format, quality, video_codec))
+    return output_path
 
 
 def list_supported_formats() -> list[str]:
@@ -142,9 +372,65 @@ def list_supported_formats() -> list[str]:
     return list(SUPPORTED_FORMATS.keys())
 
 
-def main() -> None:
-    """Interactive CLI for video conversion."""
+def _expand_inputs(patterns: list[str]) -> list[str]:
+    """Expand glob patterns into file paths; plain paths are passed through unchanged.
+    
+    Existing files are taken literally even when their names contain glob characters,
+    e.g. 'clip [1].mp4'.
+    """
+    inputs = []
+    for pattern in patterns:
+        if not os.path.exists(pattern) and any(ch in pattern for ch in '*?['):
+            inputs.extend(sorted(glob.glob(pattern)))
+        else:
+            inputs.append(pattern)
+    return inputs
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    """Parse command-line arguments for one-shot (non-interactive) conversion."""
+    parser = argparse.ArgumentParser(prog='video_converter.py', description="Convert videos between formats.")
+    parser.add_argument('inputs', nargs='+', help="input video files or glob patterns (e.g. 'clips/*.avi')")
+    parser.add_argument('-f', '--format', type=str.lower, choices=list_supported_formats(),
+                        help="output format (inferred from --output if omitted)")
+    parser.add_argument('-o', '--output', help="output path (single input only)")
+    parser.add_argument('-q', '--quality', default='medium', choices=[*QUALITY_PRESETS, 'copy'],
+                        help="quality preset (default: medium)")
+    parser.add_argument('-c', '--codec', type=str.lower, help="video codec (h264, h265, vp9, ...)")
+    parser.add_argument('--hwaccel', action='store_true', help="use a hardware encoder when available")
+    parser.add_argument('--no-remux', dest='remux', action='store_false',
+                        help="always re-encode, even when streams could be copied")
+    args = parser.parse_args(argv)
+    args.inputs = _expand_inputs(args.inputs)
+    if not args.inputs:
+        parser.error("no input files match")
+    if len(args.inputs) > 1:
+        if args.output:
+            parser.error("--output can only be used with a single input")
+        if not args.format:
+            parser.error("--format is required with multiple inputs")
+    return args
+
+
+def _run(args: argparse.Namespace) -> None:
+    """Perform the conversions described by parsed command-line arguments.
+    
+    Inputs are converted one after another, since ffmpeg already uses every core per file.
+    """
+    for input_path in args.inputs:
+        out = convert_video(input_path, args.output, args.format, args.quality, args.codec,
+                            args.hwaccel, args.remux)
+        print(f"✓ Successfully converted to: {out}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    """CLI for video conversion: one-shot when arguments are given, interactive otherwise."""
+    argv = sys.argv[1:] if argv is None else argv
     try:
+        if argv:
+            _run(_parse_args(argv))
+            return
+        
         # Check if imageio-ffmpeg is available (will auto-download ffmpeg on first use)
         try:
             get_ffmpeg_path()
@@ -200,9 +486,10 @@ def main() -> None:
         print("  2) Medium (balanced)")
         print("  3) High (slower, smaller file)")
         print("  4) Copy (no re-encoding, fastest)")
-        quality_choice = input("Enter quality (1-4) [default: 2]: ").strip()
+        print("  5) Archive (slowest, smallest file)")
+        quality_choice = input("Enter quality (1-5) [default: 2]: ").strip()
         
-        quality_map = {'1': 'low', '2': 'medium', '3': 'high', '4': 'copy'}
+        quality_map = {'1': 'low', '2': 'medium', '3': 'high', '4': 'copy', '5': 'archive'}
         quality = quality_map.get(quality_choice, 'medium')
         
         # Optional: codec selection
@@ -212,13 +499,19 @@ def main() -> None:
             if codec_input:
                 codec = codec_input
         
+        # Optional: hardware encoding
+        hwaccel = False
+        if quality != 'copy':
+            hwaccel_input = input("Use hardware encoding if available? (y/N): ").strip().lower()
+            hwaccel = hwaccel_input in ('y', 'yes')
+        
         print(f"\nConverting:\n  Input: {input_path}\n  Output: {output_path}\n  Format: {output_format.upper()}\n  Quality: {quality}")
         if codec:
             print(f"  Codec: {codec}")
         print("\nThis may take a while...")
         
         # Perform conversion
-        out = convert_video(input_path, output_path, output_format, quality, codec)
+        out = convert_video(input_path, output_path, output_format, quality, codec, hwaccel)
         print(f"✓ Successfully converted to: {out}")
     
     except FileNotFoundError as e: